@@ -1,140 +1,220 @@
 #!/usr/bin/env python3
+import argparse
+import functools
 import os
 import sys
 import subprocess
 import re
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
 
-# --- URL Templates ---
-GITHUB_SEARCH_URL_TEMPLATE = "https://github.com/search?q=repo%3Atorvalds%2Flinux+{query}&type=code"
-LKML_SEARCH_URL_TEMPLATE = "https://lore.kernel.org/lkml/?q={query}"
-PATCHEW_SEARCH_URL_TEMPLATE = "https://patchew.org/search?q=project%3Alinux+{query}"
-
 # --- Configuration ---
 BUS_TYPES_TO_SCAN = ["pci", "usb", "platform", "i2c", "spi"]
 DMESG_LOG_MAX_WIDTH = 55
 
+# Kernel subsystems and boilerplate tags that are not board drivers.
+_BLOCKLIST = frozenset({
+    'acpi', 'alternatives', 'apparmor', 'audit', 'blacklist', 'cacheinfo', 'cma', 'console',
+    'device-mapper', 'devtmpfs', 'dma', 'dmi', 'drop_monitor', 'efi', 'efivars', 'evm',
+    'ftrace', 'fuse', 'gic', 'gicv3', 'hrtimer', 'hugetlb', 'hw-breakpoint', 'ima', 'input',
+    'integrity', 'iommu', 'its', 'kauditd_printk_skb', 'kernel', 'landlock', 'lsm', 'lr',
+    'memory', 'mce', 'microcode', 'net', 'netlabel', 'nr_irqs', 'numa', 'pc', 'pcpu-alloc',
+    'percpu', 'pid_max', 'pm', 'pnp', 'printk', 'psci', 'pstore', 'random', 'rcu', 'sched_clock',
+    'scsi', 'sdei', 'secureboot', 'serial', 'slub', 'smccc', 'smp', 'sp', 'squashfs', 'sve',
+    'systemd', 'tainted', 'tcp', 'thermal_sys', 'vfs', 'warning', 'workingset', 'yama'
+})
+
+# --- Report Headers ---
+_ACTIVE_HEADER = (f" {'Device':<22} | {'Driver':<18} | {'Patchwork Search':<65} | "
+                  f"{'GitHub Code Search':<65} | {'Mailing List Search'}")
+_ACTIVE_SEP = "-" * len(_ACTIVE_HEADER)
+_MODULES_HEADER = (f" {'Module':<22} | {'Size':<10} | {'Used by':<20} | {'Patchwork Search':<65} | "
+                   f"{'GitHub Code Search':<65} | {'Mailing List Search'}")
+_MODULES_SEP = "-" * len(_MODULES_HEADER)
+_DMESG_HEADER = (f" {'Detected Driver':<22} | {'Patchwork Search':<65} | {'GitHub Code Search':<65} | "
+                 f"{'Mailing List Search':<45} | {'Relevant dmesg Log'}")
+_DMESG_SEP = "-" * len(_DMESG_HEADER)
+
+# --- Precompiled Patterns ---
+_TS_RE = re.compile(r'^\[\s*\d+\.\d+\]\s*')
+_TAG_RE = re.compile(r'^\[\s*\d+\.\d+\]\s*(?:([^:@\[\]]+?)(?:@\S*)?\s*:|\[([\w-]+)\])')
+# Extracts a driver tag while rejecting blocklisted and generated names
+# (CPU/loop/x suffixes, nvme namespaces) in the same DFA traversal.
+_DMESG_DRIVER_RE = re.compile(
+    r'^\[\s*\d+\.\d+\]\s*'
+    r'(?!(?:(?:CPU|loop|x)\d*|nvme\d+n\d+|(?i:' + '|'.join(map(re.escape, sorted(_BLOCKLIST))) + r'))[\s:@])'
+    r'([A-Za-z][\w./-]*)(?:@\S*)?:', re.MULTILINE)
+
+@functools.lru_cache(maxsize=1024)
+def _urls(name):
+    """Returns the (Patchwork, GitHub, LKML) search URLs for a driver or module name."""
+    query = quote_plus(name)
+    return (f"https://patchew.org/search?q=project%3Alinux+{query}",
+            f"https://github.com/search?q=repo%3Atorvalds%2Flinux+{query}&type=code",
+            f"https://lore.kernel.org/lkml/?q={query}")
+
+def _read_kmsg():
+    """Drains /dev/kmsg non-blocking and reformats records as dmesg-style text."""
+    fd = os.open('/dev/kmsg', os.O_RDONLY | os.O_NONBLOCK)
+    records = []
+    try:
+        while True:
+            try:
+                records.append(os.read(fd, 8192))
+            except BlockingIOError:
+                break  # Ring buffer drained
+            except BrokenPipeError:
+                continue  # Record was overwritten mid-read; skip ahead
+    finally:
+        os.close(fd)
+
+    lines = []
+    for record in b''.join(records).decode('utf-8', 'replace').split('\n'):
+        # Records look like "prio,seq,timestamp_us,flags;message"; indented
+        # lines are key/value continuations and are skipped.
+        header, sep, message = record.partition(';')
+        if not sep or record.startswith(' '):
+            continue
+        fields = header.split(',')
+        try:
+            priority, timestamp_us = int(fields[0]), int(fields[2])
+        except (IndexError, ValueError):
+            continue
+        if priority >> 3 != 0:
+            continue  # Non-kernel facility; matches 'dmesg -k'
+        lines.append(f"[{timestamp_us // 1000000:5d}.{timestamp_us % 1000000:06d}] {message}")
+    return "\n".join(lines)
+
 def get_dmesg_output():
-    """Executes dmesg once and returns its output as a list of lines."""
+    """Reads the kernel log and returns it as a single string."""
+    try:
+        return _read_kmsg()
+    except (PermissionError, FileNotFoundError):
+        pass  # No /dev/kmsg access; fall back to the dmesg binary
     try:
-        return subprocess.check_output(['dmesg', '-k'], text=True, stderr=subprocess.DEVNULL).splitlines()
+        return subprocess.check_output(['dmesg', '-k'], text=True, stderr=subprocess.DEVNULL)
     except (subprocess.CalledProcessError, FileNotFoundError):
         print("Warning: Could not run 'dmesg'. Log output will be unavailable.")
-        return []
-
-def find_relevant_dmesg_log(driver_name, dmesg_lines):
-    """Finds the first relevant log line for a given driver from dmesg output."""
-    search_patterns = [f" {driver_name}: ", f"[{driver_name}]"]
-    if '_' in driver_name:
-        driver_name_hyphen = driver_name.replace('_', '-')
-        search_patterns.extend([f" {driver_name_hyphen}: ", f"[{driver_name_hyphen}]"])
-
+        return ""
+
+def build_driver_log_map(drivers, dmesg_lines):
+    """Maps each driver to its first dmesg line, stopping once all have matched."""
+    # Drivers are named with underscores where their log tags use hyphens;
+    # accept either spelling of the tag.
+    wanted = {driver: driver for driver in drivers}
+    for driver in drivers:
+        if '_' in driver:
+            wanted.setdefault(driver.replace('_', '-'), driver)
+
+    log_map = {}
+    remaining = set(drivers)
     for line in dmesg_lines:
-        for pattern in search_patterns:
-            if pattern in line:
-                cleaned_line = re.sub(r'^\[\s*\d+\.\d+\]\s*', '', line).strip()
-                if len(cleaned_line) > DMESG_LOG_MAX_WIDTH:
-                    return cleaned_line[:DMESG_LOG_MAX_WIDTH - 3] + "..."
-                return cleaned_line
-    return ""  # Return an empty string instead of "N/A"
-
-def show_active_drivers():
-    """Prints a list of drivers bound to active devices, showing each driver only once."""
-    print(f"🐧️ Active Device Drivers (from /sys)\n")
-    header = (f" {'Device':<22} | {'Driver':<18} | {'Patchwork Search':<65} | "
-              f"{'GitHub Code Search':<65} | {'Mailing List Search'}")
-    print(header)
-    print("-" * len(header))
-
-    processed_drivers = set()
-    for bus in BUS_TYPES_TO_SCAN:
-        bus_path = Path(f"/sys/bus/{bus}/devices")
-        if not bus_path.is_dir(): continue
-
-        for device_path in bus_path.iterdir():
-            driver_link = device_path / "driver"
-            if driver_link.is_symlink():
-                driver_name = os.path.basename(os.readlink(driver_link))
-                if driver_name in processed_drivers:
-                    continue  # Show each driver only once
-
-                device_name = device_path.name
-                query = quote_plus(driver_name)
-                github_url = GITHUB_SEARCH_URL_TEMPLATE.format(query=query)
-                lkml_url = LKML_SEARCH_URL_TEMPLATE.format(query=query)
-                patchew_url = PATCHEW_SEARCH_URL_TEMPLATE.format(query=query)
-
-                print(f" {device_name:<22} | {driver_name:<18} | {patchew_url:<65} | "
-                      f"{github_url:<65} | {lkml_url}")
-                processed_drivers.add(driver_name)
-
-def show_loaded_modules():
-    """Executes lsmod and prints a list of all loaded kernel modules."""
-    print(f"\n🐧️ All Loaded Kernel Modules (from lsmod)\n")
-    header = (f" {'Module':<22} | {'Size':<10} | {'Used by':<20} | {'Patchwork Search':<65} | "
-              f"{'GitHub Code Search':<65} | {'Mailing List Search'}")
-    print(header)
-    print("-" * len(header))
+        match = _TAG_RE.match(line)
+        if not match:
+            continue
+        driver = wanted.get((match.group(1) or match.group(2)).strip())
+        if driver is None or driver in log_map:
+            continue
+        cleaned_line = _TS_RE.sub('', line).strip()
+        if len(cleaned_line) > DMESG_LOG_MAX_WIDTH:
+            cleaned_line = cleaned_line[:DMESG_LOG_MAX_WIDTH - 3] + "..."
+        log_map[driver] = cleaned_line
+        remaining.discard(driver)
+        if not remaining:
+            break  # Every driver has a log line; skip the tail of the buffer
+    return log_map
+
+def show_active_drivers(tsv=False):
+    """Builds a report of drivers bound to active devices, showing each driver only once."""
+    if tsv:
+        out = ["Device\tDriver\tPatchwork Search\tGitHub Code Search\tMailing List Search"]
+    else:
+        out = ["🐧️ Active Device Drivers (from /sys)", "", _ACTIVE_HEADER, _ACTIVE_SEP]
 
     try:
-        lsmod_output = subprocess.check_output(['lsmod'], text=True).splitlines()
-        for line in lsmod_output[1:]:  # Skip header
-            parts = line.split()
-            if not parts: continue
-            module_name, size, used_by_list = parts[0], parts[1], parts[3:] if len(parts) > 3 else ["-"]
-            used_by = ",".join(used_by_list)
-            query = quote_plus(module_name)
-            github_url = GITHUB_SEARCH_URL_TEMPLATE.format(query=query)
-            lkml_url = LKML_SEARCH_URL_TEMPLATE.format(query=query)
-            patchew_url = PATCHEW_SEARCH_URL_TEMPLATE.format(query=query)
-            print(f" {module_name:<22} | {size:<10} | {used_by:<20} | {patchew_url:<65} | "
-                  f"{github_url:<65} | {lkml_url}")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("Could not execute the 'lsmod' command.")
-
-def show_drivers_from_dmesg(dmesg_lines):
-    """Parses dmesg logs to print a unique, filtered list of detected board drivers."""
-    print(f"\n🐧️ Drivers from dmesg Log (Unique, Filtered)\n")
-
-    blocklist = {
-        'acpi', 'alternatives', 'apparmor', 'audit', 'blacklist', 'cacheinfo', 'cma', 'console',
-        'device-mapper', 'devtmpfs', 'dma', 'dmi', 'drop_monitor', 'efi', 'efivars', 'evm',
-        'ftrace', 'fuse', 'gic', 'gicv3', 'hrtimer', 'hugetlb', 'hw-breakpoint', 'ima', 'input',
-        'integrity', 'iommu', 'its', 'kauditd_printk_skb', 'kernel', 'landlock', 'lsm', 'lr',
-        'memory', 'mce', 'microcode', 'net', 'netlabel', 'nr_irqs', 'numa', 'pc', 'pcpu-alloc',
-        'percpu', 'pid_max', 'pm', 'pnp', 'printk', 'psci', 'pstore', 'random', 'rcu', 'sched_clock',
-        'scsi', 'sdei', 'secureboot', 'serial', 'slub', 'smccc', 'smp', 'sp', 'squashfs', 'sve',
-        'systemd', 'tainted', 'tcp', 'thermal_sys', 'vfs', 'warning', 'workingset', 'yama'
-    }
-    log_pattern = re.compile(r'^\[\s*\d+\.\d+\]\s*([^:]+):.*')
-    found_drivers = set()
+        with os.scandir('/sys/bus') as buses_it:
+            buses = {bus.name: bus.path for bus in buses_it if bus.is_dir()}
+    except FileNotFoundError:
+        buses = {}
 
-    for line in dmesg_lines:
-        match = log_pattern.match(line)
-        if match:
-            driver_name = match.group(1).strip().split('@')[0]
-            if ' ' in driver_name or not driver_name or driver_name.isdigit(): continue
-            if driver_name.lower() in blocklist: continue
-            if re.match(r'^(CPU|loop|x)\d*$', driver_name) or re.match(r'^nvme\d+n\d+$', driver_name): continue
-            found_drivers.add(driver_name)
-
-    header = (f" {'Detected Driver':<22} | {'Patchwork Search':<65} | {'GitHub Code Search':<65} | "
-              f"{'Mailing List Search':<45} | {'Relevant dmesg Log'}")
-    print(header)
-    print("-" * len(header))
-
-    for driver in sorted(list(found_drivers)):
-        query = quote_plus(driver)
-        github_url = GITHUB_SEARCH_URL_TEMPLATE.format(query=query)
-        lkml_url = LKML_SEARCH_URL_TEMPLATE.format(query=query)
-        patchew_url = PATCHEW_SEARCH_URL_TEMPLATE.format(query=query)
-        dmesg_log = find_relevant_dmesg_log(driver, dmesg_lines)
-        print(f" {driver:<22} | {patchew_url:<65} | {github_url:<65} | "
-              f"{lkml_url:<45} | {dmesg_log}")
+    seen = {}
+    for bus in BUS_TYPES_TO_SCAN:
+        bus_path = buses.get(bus)
+        if bus_path is None: continue
+
+        with os.scandir(os.path.join(bus_path, "devices")) as devices:
+            for entry in devices:
+                try:
+                    driver_name = os.readlink(entry.path + "/driver").rpartition('/')[2]
+                except OSError:
+                    continue  # No bound driver, or 'driver' is not a symlink
+                seen.setdefault(driver_name, entry.name)  # Show each driver once
+
+    for driver_name, device_name in seen.items():
+        patchew_url, github_url, lkml_url = _urls(driver_name)
+        if tsv:
+            out.append("\t".join((device_name, driver_name, patchew_url, github_url, lkml_url)))
+        else:
+            out.append(f" {device_name:<22} | {driver_name:<18} | {patchew_url:<65} | "
+                       f"{github_url:<65} | {lkml_url}")
+
+    return "\n".join(out) + "\n"
+
+def show_loaded_modules(tsv=False):
+    """Reads /proc/modules and builds a report of all loaded kernel modules."""
+    if tsv:
+        out = ["Module\tSize\tUsed by\tPatchwork Search\tGitHub Code Search\tMailing List Search"]
+    else:
+        out = ["", "🐧️ All Loaded Kernel Modules (from /proc/modules)", "", _MODULES_HEADER, _MODULES_SEP]
 
+    try:
+        with open('/proc/modules') as modules_file:
+            # Fields: name size refcount used_by state address
+            for line in modules_file:
+                parts = line.split()
+                if not parts: continue
+                module_name, size = parts[0], parts[1]
+                used_by = parts[3].rstrip(',') if len(parts) > 3 and parts[3] != '-' else "-"
+                patchew_url, github_url, lkml_url = _urls(module_name)
+                if tsv:
+                    out.append("\t".join((module_name, size, used_by, patchew_url, github_url, lkml_url)))
+                else:
+                    out.append(f" {module_name:<22} | {size:<10} | {used_by:<20} | {patchew_url:<65} | "
+                               f"{github_url:<65} | {lkml_url}")
+    except OSError:
+        out.append("Could not read '/proc/modules'.")
+
+    return "\n".join(out) + "\n"
+
+def show_drivers_from_dmesg(dmesg_text, tsv=False):
+    """Parses dmesg logs to build a unique, filtered report of detected board drivers."""
+    found_drivers = set(_DMESG_DRIVER_RE.findall(dmesg_text))
+    log_map = build_driver_log_map(found_drivers, dmesg_text.splitlines())
+
+    if tsv:
+        out = ["Detected Driver\tPatchwork Search\tGitHub Code Search\tMailing List Search\tRelevant dmesg Log"]
+    else:
+        out = ["", "🐧️ Drivers from dmesg Log (Unique, Filtered)", "", _DMESG_HEADER, _DMESG_SEP]
+
+    for driver in sorted(found_drivers):
+        patchew_url, github_url, lkml_url = _urls(driver)
+        dmesg_log = log_map.get(driver, "")
+        if tsv:
+            out.append("\t".join((driver, patchew_url, github_url, lkml_url, dmesg_log)))
+        else:
+            out.append(f" {driver:<22} | {patchew_url:<65} | {github_url:<65} | "
+                       f"{lkml_url:<45} | {dmesg_log}")
+
+    return "\n".join(out) + "\n"
+
+
+def main(argv=None):
+    """Command-line entry point; runs all three reports."""
+    parser = argparse.ArgumentParser(description="Maps active drivers and modules to kernel development resources.")
+    parser.add_argument('--tsv', action='store_true',
+                        help="emit tab-separated rows without column padding")
+    args = parser.parse_args(argv)
 
-if __name__ == "__main__":
     if os.geteuid() != 0:
         print("🛑 This script requires root privileges.")
         print("   Please run with sudo to read 'dmesg' logs for complete information.")
@@ -142,7 +222,14 @@ if __name__ == "__main__":
         sys.exit(1)
 
     dmesg_output = get_dmesg_output()
-    show_active_drivers()
-    show_loaded_modules()
-    show_drivers_from_dmesg(dmesg_output)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(show_active_drivers, args.tsv),
+                   executor.submit(show_loaded_modules, args.tsv),
+                   executor.submit(show_drivers_from_dmesg, dmesg_output, args.tsv)]
+        for future in futures:  # Print in deterministic section order
+            sys.stdout.write(future.result())
+
+
+if __name__ == "__main__":
+    main()
 